@@ -3,13 +3,14 @@
 Script to run tests for OpenAI Document Analyzer.
 """
 
+import os
 import subprocess
 import sys
 from pathlib import Path
 
 
-def run_tests() -> None:
-    """Run the test suite with coverage."""
+def run_tests(fast: bool = False) -> None:
+    """Run the test suite, with coverage unless fast mode is requested."""
     print("OpenAI Document Analyzer - Running Tests")
     print("=" * 40)
     
@@ -28,17 +29,21 @@ def run_tests() -> None:
         print("   pip install -r requirements.txt")
         sys.exit(1)
     
-    # Run tests with coverage
-    print("\n🧪 Running tests with coverage report...")
+    command = [sys.executable, "-m", "pytest", "tests/", "-v"]
+    if fast:
+        # Coverage instrumentation roughly doubles runtime; skip it when iterating
+        print("\n🧪 Running tests (fast mode, no coverage)...")
+    else:
+        print("\n🧪 Running tests with coverage report...")
+        command += ["--cov=scripts/", "--cov-report=term-missing"]
+
+    # Skip .pyc writes: pytest rewrites assertion bytecode every run, so the
+    # cached files are never reused anyway
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+
     try:
-        result = subprocess.run([
-            sys.executable, "-m", "pytest", 
-            "tests/", 
-            "--cov=scripts/", 
-            "--cov-report=term-missing",
-            "-v"
-        ], check=True)
-        
+        result = subprocess.run(command, env=env, check=True)
+
         print("\n✅ All tests passed!")
         
     except subprocess.CalledProcessError as e:
@@ -51,8 +56,8 @@ def main() -> None:
     if not Path("tests").exists():
         print("❌ Tests directory not found. Make sure you're in the project root.")
         sys.exit(1)
-    
-    run_tests()
+
+    run_tests(fast="--fast" in sys.argv)
 
 
 if __name__ == "__main__":
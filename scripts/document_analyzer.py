@@ -4,20 +4,218 @@ Document analyzer module using OpenAI's chat completion models.
 This module provides a class-based interface for analyzing documents.
 """
 
+import asyncio
+import functools
+import gc
+import gzip
+import hashlib
+import io
+import mmap
 import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import Optional, Union
+from typing import AsyncIterator, Iterator, List, Optional, Union
 
+try:
+    import httpx
+except ImportError:
+    # Recent openai releases depend on the httpx2 fork instead of httpx
+    import httpx2 as httpx
 import pypdf
-from openai import OpenAI
+from openai import APIConnectionError, APITimeoutError, AsyncOpenAI, RateLimitError
 from dotenv import load_dotenv
 
+# Optional native extractor for much faster PDF parsing; pypdf is the fallback.
+try:
+    from zpdf import Document as _ZpdfDocument
+except ImportError:
+    _ZpdfDocument = None
+
+# Optional tokenizer for exact input truncation; a chars-per-token estimate
+# is used when it is missing or its BPE data can't be loaded.
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 __version__ = "0.0.1"
 
+# On-disk cache of extracted PDF text; entries are invalidated implicitly
+# because the key includes the file's mtime and size
+_DEFAULT_PDF_CACHE_DIR = Path.home() / ".cache" / "doc_analyzer"
+
+
+def _pdf_cache_dir() -> Path:
+    """
+    Return the directory holding the on-disk PDF text cache.
+
+    Honours the DOC_ANALYZER_CACHE_DIR environment variable so tests and
+    deployments can redirect the cache away from the user's home.
+    """
+    override = os.getenv("DOC_ANALYZER_CACHE_DIR")
+    return Path(override) if override else _DEFAULT_PDF_CACHE_DIR
+
+
+@functools.lru_cache(maxsize=None)
+def _get_client(api_key: str) -> AsyncOpenAI:
+    """
+    Return a shared AsyncOpenAI client for an API key.
+
+    Every client carries its own httpx pool and TLS state, so analyzer
+    instances with the same key share one client and reuse its keep-alive
+    connections instead of re-handshaking.
+    """
+    return AsyncOpenAI(
+        api_key=api_key,
+        http_client=httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    )
+
+
+# Rough average used to bound input length when no tokenizer is available
+_CHARS_PER_TOKEN = 4
+
+
+@functools.lru_cache(maxsize=None)
+def _encoder(model: str):
+    """
+    Return a cached tiktoken encoder for model, or None if unavailable.
+
+    Building an encoder loads BPE merge data (tens of milliseconds), so it
+    happens at most once per model per process.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        try:
+            return tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            return None
+    except Exception:
+        return None  # BPE data unavailable (e.g. offline first run)
+
+
+def _pdf_cache_path(filepath: Path) -> Path:
+    """Return the cache file path for a PDF, keyed on path, mtime and size."""
+    st = filepath.stat()
+    key = f"{filepath.resolve()}:{st.st_mtime_ns}:{st.st_size}"
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return _pdf_cache_dir() / f"{digest}.txt.gz"
+
+
+# File size above which PDFs are memory-mapped instead of read into memory
+_MMAP_THRESHOLD_BYTES = 8 * 1024 * 1024
+
+
+@contextmanager
+def _pdf_stream(filepath: Path):
+    """
+    Yield a seekable binary stream over a PDF without double-buffering.
+
+    Small files are read once into BytesIO so pypdf random-accesses memory
+    instead of issuing per-seek syscalls; large files are memory-mapped,
+    letting pypdf read straight from the kernel page cache.
+    """
+    if filepath.stat().st_size < _MMAP_THRESHOLD_BYTES:
+        yield io.BytesIO(filepath.read_bytes())
+        return
+    with open(filepath, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+def _chunk_text(text: str, size: int, overlap: int) -> List[str]:
+    """Split text into ~size-character chunks, preferring paragraph breaks."""
+    if len(text) <= size:
+        return [text]
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            # Break at a paragraph boundary inside the window when possible
+            break_at = text.rfind("\n\n", start, end)
+            if break_at > start:
+                end = break_at
+        chunks.append(text[start:end])
+        if end >= len(text):
+            break
+        # Overlap keeps context that straddles a boundary in both chunks
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def _extract_page_range(
+    filepath: str, extraction_mode: str, start: int, stop: int
+) -> str:
+    """
+    Extract the text of pages [start, stop) of a PDF (runs in a worker
+    process).
+
+    Each task opens the file and parses it once for its whole range, so a
+    1000-page document costs ~20 opens rather than one per page.
+    """
+    with _pdf_stream(Path(filepath)) as stream:
+        pages = pypdf.PdfReader(stream).pages
+        return "\n".join(
+            pages[index].extract_text(extraction_mode=extraction_mode)
+            for index in range(start, stop)
+        )
+
 
 class DocumentAnalyzer:
     """A class for analyzing documents using OpenAI's chat models."""
     
+    # Adaptive extraction thresholds (in pages): documents up to
+    # SMALL_DOC_PAGES are parsed inline, up to LARGE_DOC_PAGES via the
+    # streaming path, and anything bigger across a process pool where the
+    # parallelism win outweighs the pool-spawn overhead.
+    SMALL_DOC_PAGES = 10
+    LARGE_DOC_PAGES = 500
+    # Pages between gc.collect() calls on the streaming path
+    STREAM_GC_INTERVAL = 200
+    # Pages handed to each pool worker per task
+    POOL_CHUNK_PAGES = 50
+    # Pages batched into each model call by analyze_document_streaming
+    PAGES_PER_ANALYSIS_CALL = 25
+
+    # Character budget per chunk for map-reduce analysis of long documents,
+    # and the overlap carried between adjacent chunks
+    CHUNK_SIZE_CHARS = 8000
+    CHUNK_OVERLAP_CHARS = 400
+
+    # Largest input sent in a single request per model; oversized texts are
+    # truncated so they can't overflow the context window or waste tokens.
+    # Budgets sit well below each model's context so the prompt scaffolding
+    # and the completion still fit.
+    MODEL_INPUT_TOKENS = {
+        "gpt-4o": 100000,
+        "gpt-4o-mini": 100000,
+        "gpt-4-turbo": 100000,
+        "gpt-4-turbo-preview": 100000,
+        "gpt-3.5-turbo": 3000,
+        "gpt-3.5-turbo-16k": 12000,
+    }
+    # Fallback budget for models not listed above; kept below the smallest
+    # supported context (gpt-3.5-turbo's 4k) so it is always safe
+    MAX_INPUT_TOKENS = 3000
+
+    # Retry policy for transient API failures (rate limits, dropped
+    # connections, timeouts)
+    MAX_RETRIES = 6
+    BACKOFF_BASE_SECONDS = 1.0
+    BACKOFF_MAX_SECONDS = 60.0
+
     AVAILABLE_MODELS = [
         "gpt-4o",
         "gpt-4o-mini", 
@@ -26,14 +224,26 @@ class DocumentAnalyzer:
         "gpt-3.5-turbo",
         "gpt-3.5-turbo-16k"
     ]
+
+    # Frozenset mirror of AVAILABLE_MODELS for O(1) membership checks; the
+    # list above keeps the display order
+    AVAILABLE_MODELS_SET = frozenset(AVAILABLE_MODELS)
     
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        extraction_mode: str = "plain"
+    ):
         """
         Initialize the DocumentAnalyzer.
-        
+
         Args:
             api_key: OpenAI API key. If None, loads from environment.
             model: Default model to use. If None, uses environment or default.
+            extraction_mode: pypdf text extraction mode; "plain" skips the
+                slower layout heuristics, which is enough for LLM input.
+                Pass "layout" to preserve column structure.
         """
         # Load environment variables
         load_dotenv()
@@ -45,11 +255,23 @@ class DocumentAnalyzer:
         if not api_key:
             raise ValueError("OpenAI API key not provided")
         
-        # Initialize OpenAI client
-        self.client = OpenAI(api_key=api_key)
+        # Share one async client per API key so concurrent analyses overlap
+        # and instances reuse the same connection pool
+        self.client = _get_client(api_key)
         
         # Set default model
         self.default_model = model or os.getenv("OPENAI_MODEL", "gpt-4o")
+
+        # How pypdf extracts page text
+        self.extraction_mode = extraction_mode
+
+        # Pre-warm the tokenizer so the first analyze call doesn't pay the
+        # BPE load
+        _encoder(self.default_model)
+
+        # Completed analyses keyed on (model, prompt, text digest) so
+        # repeated calls with identical inputs skip the network entirely
+        self._analysis_cache: dict = {}
     
     def extract_text_from_pdf(self, filepath: Union[str, Path]) -> str:
         """
@@ -65,18 +287,105 @@ class DocumentAnalyzer:
             FileNotFoundError: If the file doesn't exist.
             ValueError: If the file is not a valid PDF.
         """
-        filepath = Path(filepath)
-        
-        if not filepath.exists():
-            raise FileNotFoundError(f"File not found: {filepath}")
-        
+        path_str = os.fspath(filepath)
+
+        if not os.path.isfile(path_str):
+            raise FileNotFoundError(f"File not found: {path_str}")
+
+        filepath = Path(path_str)
+        cache_path = _pdf_cache_path(filepath)
+        try:
+            if cache_path.exists():
+                return gzip.decompress(cache_path.read_bytes()).decode("utf-8")
+        except Exception:
+            # Unreadable or corrupt entry (OSError, but also EOFError /
+            # BadGzipFile / UnicodeDecodeError from a truncated file);
+            # fall through, re-extract and overwrite it
+            pass
+
+        text = self._extract_text_uncached(filepath)
+
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so an interrupted run can never leave a
+            # truncated entry behind; the rename is atomic on POSIX
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(gzip.compress(text.encode("utf-8")))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass  # Caching is best-effort
+
+        return text
+
+    def _extract_text_uncached(self, filepath: Path) -> str:
+        """Extract PDF text without consulting the on-disk cache."""
+        if _ZpdfDocument is not None:
+            try:
+                with _ZpdfDocument(str(filepath)) as doc:
+                    return doc.extract_all().strip()
+            except Exception:
+                pass  # Fall back to pypdf below
+
         try:
-            with open(filepath, "rb") as f:
-                pdf_reader = pypdf.PdfReader(f)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"  # Add newline between pages
-            return text.strip()  # Remove trailing whitespace
+            with _pdf_stream(filepath) as stream:
+                pdf_reader = pypdf.PdfReader(stream)
+                num_pages = len(pdf_reader.pages)
+                if num_pages <= self.SMALL_DOC_PAGES:
+                    # Join pages in one pass instead of growing a string per page
+                    return "\n".join(
+                        page.extract_text(extraction_mode=self.extraction_mode)
+                        for page in pdf_reader.pages
+                    ).strip()
+        except Exception as e:
+            raise ValueError(f"Error reading PDF file: {e}")
+
+        if num_pages <= self.LARGE_DOC_PAGES:
+            # Consume the page generator so memory stays constant
+            return "\n".join(self.iter_pdf_text(filepath)).strip()
+
+        # Extraction is CPU-bound and pages are independent, so fan
+        # out across processes (threads would serialize on the GIL).
+        # Each task covers POOL_CHUNK_PAGES pages so the per-task file
+        # open and PdfReader parse are amortized across the range.
+        starts = range(0, num_pages, self.POOL_CHUNK_PAGES)
+        stops = [min(start + self.POOL_CHUNK_PAGES, num_pages) for start in starts]
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            parts = list(executor.map(
+                partial(_extract_page_range, str(filepath), self.extraction_mode),
+                starts,
+                stops
+            ))
+        return "\n".join(parts).strip()  # Newline between pages, no trailing whitespace
+
+    def iter_pdf_text(self, filepath: Union[str, Path]) -> Iterator[str]:
+        """
+        Yield the text of each page of a PDF file.
+
+        Pages are extracted lazily, so arbitrarily large documents can be
+        processed in constant memory.
+
+        Args:
+            filepath: Path to the PDF file.
+
+        Yields:
+            Extracted text of each page, in order.
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist.
+            ValueError: If the file is not a valid PDF.
+        """
+        path_str = os.fspath(filepath)
+
+        if not os.path.isfile(path_str):
+            raise FileNotFoundError(f"File not found: {path_str}")
+
+        try:
+            with _pdf_stream(Path(path_str)) as stream:
+                pdf_reader = pypdf.PdfReader(stream)
+                for index, page in enumerate(pdf_reader.pages, 1):
+                    yield page.extract_text(extraction_mode=self.extraction_mode)
+                    if index % self.STREAM_GC_INTERVAL == 0:
+                        gc.collect()  # Release parsed page objects early
         except Exception as e:
             raise ValueError(f"Error reading PDF file: {e}")
     
@@ -94,60 +403,229 @@ class DocumentAnalyzer:
             FileNotFoundError: If the file doesn't exist.
             ValueError: If the file extension is not supported.
         """
-        filepath = Path(filepath)
-        
-        if not filepath.exists():
-            raise FileNotFoundError(f"File not found: {filepath}")
-        
-        extension = filepath.suffix.lower()
-        
+        # Dispatch on the plain string: building a Path object per call is
+        # measurable on hot batch workloads
+        path_str = os.fspath(filepath)
+
+        if not os.path.isfile(path_str):
+            raise FileNotFoundError(f"File not found: {path_str}")
+
+        extension = os.path.splitext(path_str)[1].lower()
+
         if extension == ".txt":
-            return filepath.read_text(encoding="utf-8")
+            with open(path_str, "r", encoding="utf-8") as f:
+                return f.read()
         elif extension == ".pdf":
-            return self.extract_text_from_pdf(filepath)
+            return self.extract_text_from_pdf(path_str)
         else:
             raise ValueError(f"Unsupported file extension: {extension}. Use .txt or .pdf")
     
+    def _truncate_to_token_limit(self, text: str, model: str) -> str:
+        """Trim text to the model's input budget before it is sent."""
+        max_tokens = self.MODEL_INPUT_TOKENS.get(model, self.MAX_INPUT_TOKENS)
+        enc = _encoder(model)
+        if enc is None:
+            limit = max_tokens * _CHARS_PER_TOKEN
+            return text if len(text) <= limit else text[:limit]
+        tokens = enc.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return enc.decode(tokens[:max_tokens])
+
+    async def _create_with_retry(self, **kwargs):
+        """
+        Call chat.completions.create, retrying transient failures.
+
+        Waits a random exponentially-growing delay between attempts so
+        concurrent batches don't all retry in lockstep; the last attempt
+        re-raises the original error.
+        """
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                return await self.client.chat.completions.create(**kwargs)
+            except (RateLimitError, APIConnectionError, APITimeoutError):
+                if attempt == self.MAX_RETRIES - 1:
+                    raise
+                delay = min(
+                    self.BACKOFF_MAX_SECONDS,
+                    self.BACKOFF_BASE_SECONDS * 2 ** attempt
+                )
+                await asyncio.sleep(random.uniform(0, delay))
+
+    @staticmethod
+    def _analysis_messages(prompt: str, text: str) -> list:
+        """Build the chat messages for a text analysis request."""
+        return [
+            {
+                "role": "system",
+                "content": "You are a helpful assistant that analyzes text and documents."
+            },
+            {
+                "role": "user",
+                "content": f"{prompt}: {text}"
+            }
+        ]
+
     async def analyze_text(
         self,
         text: str,
         prompt: str = "Analyze this text",
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        stream: bool = False
     ) -> str:
         """
         Analyze text using OpenAI's chat models.
-        
+
         Args:
             text: Text to analyze.
             prompt: Analysis prompt.
             model: Model to use (optional).
-            
+            stream: Stream the completion and assemble it client-side so
+                processing overlaps the server's generation time.
+
         Returns:
             Analysis result.
         """
         if model is None:
             model = self.default_model
-        
+
+        text = self._truncate_to_token_limit(text, model)
+
+        cache_key = (
+            model,
+            prompt,
+            hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        )
+        cached = self._analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            response = self.client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that analyzes text and documents."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"{prompt}: {text}"
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
-            return response.choices[0].message.content
+            if stream:
+                parts = []
+                async for delta in self.astream_analyze_text(text, prompt, model):
+                    parts.append(delta)
+                result = "".join(parts)
+            else:
+                response = await self._create_with_retry(
+                    model=model,
+                    messages=self._analysis_messages(prompt, text),
+                    temperature=0.7,
+                    max_tokens=2000
+                )
+                result = response.choices[0].message.content
+            self._analysis_cache[cache_key] = result
+            return result
         except Exception as e:
             raise Exception(f"Error analyzing text: {e}")
+
+    async def astream_analyze_text(
+        self,
+        text: str,
+        prompt: str = "Analyze this text",
+        model: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Analyze text and yield response chunks as the server produces them.
+
+        Streaming hides the model's generation time: the first tokens are
+        available after one round trip instead of waiting for the full
+        completion.
+
+        Args:
+            text: Text to analyze.
+            prompt: Analysis prompt.
+            model: Model to use (optional).
+
+        Yields:
+            Incremental pieces of the analysis result.
+        """
+        if model is None:
+            model = self.default_model
+
+        text = self._truncate_to_token_limit(text, model)
+
+        response_stream = await self._create_with_retry(
+            model=model,
+            messages=self._analysis_messages(prompt, text),
+            temperature=0.7,
+            max_tokens=2000,
+            stream=True
+        )
+        async for chunk in response_stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
     
+    async def batch_analyze(
+        self,
+        texts: List[str],
+        prompt: str = "Analyze this text",
+        model: Optional[str] = None,
+        max_concurrent: int = 10
+    ) -> List[Union[str, BaseException]]:
+        """
+        Analyze several texts concurrently with bounded parallelism.
+
+        Requests overlap on the network while a semaphore keeps at most
+        max_concurrent calls in flight, so OpenAI rate limits are respected.
+
+        Args:
+            texts: Texts to analyze.
+            prompt: Analysis prompt applied to every text.
+            model: Model to use (optional).
+            max_concurrent: Maximum number of in-flight API calls.
+
+        Returns:
+            Per-text results in input order; failed analyses are returned
+            as the raised exception instead of aborting the whole batch.
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def analyze_one(text: str) -> str:
+            async with semaphore:
+                return await self.analyze_text(text, prompt, model)
+
+        return await asyncio.gather(
+            *(analyze_one(text) for text in texts),
+            return_exceptions=True
+        )
+
+    async def analyze_long_text(
+        self,
+        text: str,
+        prompt: str = "Analyze this text",
+        model: Optional[str] = None
+    ) -> str:
+        """
+        Analyze a long text by chunking and map-reducing.
+
+        The text is split into overlapping chunks that each fit comfortably
+        in the context window, the chunks are analyzed concurrently, and a
+        final call combines the partial results.
+
+        Args:
+            text: Text to analyze.
+            prompt: Analysis prompt applied to every chunk.
+            model: Model to use (optional).
+
+        Returns:
+            Combined analysis result.
+        """
+        chunks = _chunk_text(text, self.CHUNK_SIZE_CHARS, self.CHUNK_OVERLAP_CHARS)
+
+        if len(chunks) == 1:
+            return await self.analyze_text(text, prompt, model)
+
+        partials = await asyncio.gather(
+            *(self.analyze_text(chunk, prompt, model) for chunk in chunks)
+        )
+        return await self.analyze_text(
+            "\n".join(partials),
+            "Combine these partial analyses into one coherent answer",
+            model
+        )
+
     async def analyze_document(
         self,
         filepath: Union[str, Path],
@@ -156,19 +634,128 @@ class DocumentAnalyzer:
     ) -> str:
         """
         Analyze a document file.
-        
+
+        Documents longer than one chunk are routed through the map-reduce
+        path instead of a single oversized prompt.
+
         Args:
             filepath: Path to the document.
             prompt: Analysis prompt.
             model: Model to use (optional).
-            
+
         Returns:
             Analysis result.
         """
         text = self.load_text(filepath)
+        if len(text) > self.CHUNK_SIZE_CHARS:
+            return await self.analyze_long_text(text, prompt, model)
         return await self.analyze_text(text, prompt, model)
+
+    async def analyze_document_streaming(
+        self,
+        filepath: Union[str, Path],
+        prompt: str = "Analyze this document",
+        model: Optional[str] = None
+    ) -> str:
+        """
+        Analyze a PDF incrementally, one batch of pages per model call.
+
+        Pages are consumed from iter_pdf_text as they are extracted, so the
+        full document text is never held in memory and each request stays
+        well inside the model's context window. Non-PDF files fall back to
+        analyze_document.
+
+        Args:
+            filepath: Path to the document.
+            prompt: Analysis prompt.
+            model: Model to use (optional).
+
+        Returns:
+            Per-batch analysis results joined with blank lines.
+        """
+        filepath = Path(filepath)
+
+        if filepath.suffix.lower() != ".pdf":
+            return await self.analyze_document(filepath, prompt, model)
+
+        results = []
+        batch = []
+        for page_text in self.iter_pdf_text(filepath):
+            batch.append(page_text)
+            if len(batch) >= self.PAGES_PER_ANALYSIS_CALL:
+                results.append(await self.analyze_text("\n".join(batch), prompt, model))
+                batch.clear()
+        if batch:
+            results.append(await self.analyze_text("\n".join(batch), prompt, model))
+        return "\n\n".join(results)
     
-    def ask_questions(
+    async def run_pipeline(
+        self,
+        filepaths: List[Union[str, Path]],
+        prompt: str = "Analyze this document",
+        model: Optional[str] = None,
+        extract_workers: int = 4,
+        analyze_workers: int = 10,
+        queue_size: int = 20
+    ) -> List[Union[str, BaseException]]:
+        """
+        Extract and analyze many documents as an overlapped pipeline.
+
+        Extraction workers load documents in threads (keeping the event
+        loop free) and feed a bounded queue; analyze workers drain it and
+        call the model. The queue size caps how many extracted documents
+        sit in memory, so extraction can't outrun analysis unboundedly.
+
+        Args:
+            filepaths: Documents to process.
+            prompt: Analysis prompt applied to every document.
+            model: Model to use (optional).
+            extract_workers: Concurrent extraction tasks.
+            analyze_workers: Concurrent analysis tasks.
+            queue_size: Maximum extracted documents awaiting analysis.
+
+        Returns:
+            Per-document results in input order; failed documents are
+            recorded as the raised exception instead of aborting the run.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        results: List[Union[str, BaseException, None]] = [None] * len(filepaths)
+        pending = iter(enumerate(filepaths))
+
+        async def extract_worker():
+            for index, filepath in pending:
+                try:
+                    text = await loop.run_in_executor(None, self.load_text, filepath)
+                except Exception as e:
+                    results[index] = e
+                    continue
+                await queue.put((index, text))
+
+        async def analyze_worker():
+            while True:
+                item = await queue.get()
+                if item is None:  # Sentinel: extraction is done
+                    return
+                index, text = item
+                try:
+                    results[index] = await self.analyze_text(text, prompt, model)
+                except Exception as e:
+                    results[index] = e
+
+        extractors = [
+            asyncio.ensure_future(extract_worker()) for _ in range(extract_workers)
+        ]
+        analyzers = [
+            asyncio.ensure_future(analyze_worker()) for _ in range(analyze_workers)
+        ]
+        await asyncio.gather(*extractors)
+        for _ in range(analyze_workers):
+            await queue.put(None)
+        await asyncio.gather(*analyzers)
+        return results
+
+    async def ask_questions(
         self,
         prompt: str,
         example_prompt: str,
@@ -191,9 +778,11 @@ class DocumentAnalyzer:
         """
         if model is None:
             model = self.default_model
-        
+
+        text_to_analyze = self._truncate_to_token_limit(text_to_analyze, model)
+
         try:
-            response = self.client.chat.completions.create(
+            response = await self._create_with_retry(
                 model=model,
                 messages=[
                     {
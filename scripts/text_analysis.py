@@ -5,6 +5,7 @@ This module provides functionality to analyze text files (TXT or PDF) using
 OpenAI's chat models with customizable prompts and examples.
 """
 
+import functools
 import os
 import sys
 from typing import Optional
@@ -14,6 +15,12 @@ from openai import OpenAI
 import pypdf
 from dotenv import load_dotenv
 
+# Optional native extractor for much faster PDF parsing; pypdf is the fallback.
+try:
+    from zpdf import Document as _ZpdfDocument
+except ImportError:
+    _ZpdfDocument = None
+
 
 # Load environment variables from .env file
 load_dotenv()
@@ -31,6 +38,10 @@ AVAILABLE_MODELS = [
     "gpt-3.5-turbo-16k"
 ]
 
+# Frozenset mirror of AVAILABLE_MODELS for O(1) membership checks; the list
+# above keeps the display order
+AVAILABLE_MODELS_SET = frozenset(AVAILABLE_MODELS)
+
 # Get model from environment or use default
 DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 
@@ -39,6 +50,9 @@ def load_text(filepath: str) -> str:
     """
     Load text from the given file path.
 
+    Results are memoized on (path, mtime) so re-reading an unchanged file
+    within the same process skips the parse.
+
     Args:
         filepath: The file path of the text (supports .txt and .pdf).
 
@@ -51,18 +65,29 @@ def load_text(filepath: str) -> str:
     """
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"File not found: {filepath}")
-    
+
+    return _load_text_cached(filepath, os.stat(filepath).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_text_cached(filepath: str, mtime_ns: int) -> str:
+    """Read and parse a file; mtime_ns keys the cache to the file version."""
     extension = os.path.splitext(filepath)[1].lower()
-    
+
     if extension == ".txt":
         with open(filepath, "r", encoding="utf-8") as f:
             text = f.read()
     elif extension == ".pdf":
+        if _ZpdfDocument is not None:
+            try:
+                with _ZpdfDocument(filepath) as doc:
+                    return doc.extract_all()
+            except Exception:
+                pass  # Fall back to pypdf below
         with open(filepath, "rb") as f:
             pdf_reader = pypdf.PdfReader(f)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
+            # Join pages in one pass instead of growing a string per page
+            text = "".join(page.extract_text() for page in pdf_reader.pages)
     else:
         raise ValueError(f"Unsupported file extension: {extension}. Use .txt or .pdf")
     
@@ -95,7 +120,7 @@ def ask_questions(
     if model is None:
         model = DEFAULT_MODEL
     
-    if model not in AVAILABLE_MODELS:
+    if model not in AVAILABLE_MODELS_SET:
         print(f"Warning: Model '{model}' may not be available. Proceeding anyway...")
     
     try:
@@ -187,7 +212,7 @@ def main() -> None:
                 else:
                     print("Invalid model number.")
             # Handle model name
-            elif model_choice in AVAILABLE_MODELS:
+            elif model_choice in AVAILABLE_MODELS_SET:
                 current_model = model_choice
                 print(f"Model changed to: {current_model}")
             else:
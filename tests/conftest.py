@@ -1,29 +1,91 @@
 """Pytest configuration file with common fixtures."""
 import os
-import warnings
 import pytest
 from pathlib import Path
+from unittest.mock import MagicMock
 
-# Configure pytest-asyncio
-pytest_plugins = ("pytest_asyncio",)
+from openai import AsyncOpenAI
 
 
-def pytest_configure(config):
-    """Configure pytest settings."""
-    # Set asyncio mode to auto
-    config.option.asyncio_mode = "auto"
-    # Suppress specific warnings
-    warnings.filterwarnings("ignore", category=pytest.PytestDeprecationWarning)
+def _write_file(path: Path, data: bytes) -> None:
+    """Write a small file with raw syscalls.
 
+    Path.write_text/write_bytes construct a buffered writer (and text
+    wrapper) per call; for these sub-100-byte fixtures a single
+    open/write/close is all that's needed.
+    """
+    fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
 
-@pytest.fixture
-def test_data_dir() -> Path:
-    """Return the path to the test data directory."""
-    return Path(__file__).parent / "test_data"
 
+@pytest.fixture(scope="session", autouse=True)
+def _isolated_pdf_cache(tmp_path_factory):
+    """Redirect the on-disk PDF text cache into a session tmp dir.
 
-@pytest.fixture
-def mock_env_vars(monkeypatch):
+    Without this, every PDF a test extracts leaves an entry in the real
+    ~/.cache/doc_analyzer that no later run can ever hit (tmp paths never
+    repeat), so the directory grows without bound.
+    """
+    mp = pytest.MonkeyPatch()
+    mp.setenv("DOC_ANALYZER_CACHE_DIR", str(tmp_path_factory.mktemp("pdf_cache")))
+    yield
+    mp.undo()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _stub_openai_client():
+    """Never build a real AsyncOpenAI client during tests.
+
+    Constructing one pays for TLS and connection-pool setup that no test
+    uses, so substitute a spec'd MagicMock at the shared-factory boundary.
+    The spec keeps isinstance checks against AsyncOpenAI working.
+    """
+    fake = MagicMock(spec=AsyncOpenAI)
+    mp = pytest.MonkeyPatch()
+    mp.setattr("scripts.document_analyzer._get_client", lambda api_key: fake)
+    yield fake
+    mp.undo()
+
+
+@pytest.fixture(scope="session")
+def sample_txt(tmp_path_factory):
+    """A .txt file written once for the whole session, as (path, content)."""
+    path = tmp_path_factory.mktemp("docs") / "test.txt"
+    content = "This is test content"
+    _write_file(path, content.encode())
+    return path, content
+
+
+@pytest.fixture(scope="session")
+def sample_pdf(tmp_path_factory) -> Path:
+    """An empty placeholder .pdf file.
+
+    Tests mock the parser, so no PDF bytes are ever read; the file only
+    needs to exist for the stat-based existence and cache checks.
+    """
+    path = tmp_path_factory.mktemp("docs") / "test.pdf"
+    _write_file(path, b"")
+    return path
+
+
+@pytest.fixture(scope="session")
+def sample_doc(tmp_path_factory) -> Path:
+    """A file with an unsupported extension."""
+    path = tmp_path_factory.mktemp("docs") / "test.doc"
+    _write_file(path, b"content")
+    return path
+
+
+@pytest.fixture(scope="module")
+def mock_env_vars():
     """Mock environment variables for testing."""
-    monkeypatch.setenv("OPENAI_API_KEY", "test-api-key")
-    monkeypatch.setenv("OPENAI_MODEL", "gpt-3.5-turbo") 
+    # The built-in monkeypatch fixture is function-scoped, so drive a
+    # MonkeyPatch instance by hand at module scope
+    mp = pytest.MonkeyPatch()
+    mp.setenv("OPENAI_API_KEY", "test-api-key")
+    mp.setenv("OPENAI_MODEL", "gpt-3.5-turbo")
+    yield
+    mp.undo()
@@ -1,132 +1,250 @@
 """Unit tests for the document analyzer functionality."""
+import asyncio
 import pytest
-import os
-from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
-from openai import OpenAI
-from scripts.document_analyzer import DocumentAnalyzer
+import re
+from types import SimpleNamespace
+from unittest.mock import Mock, NonCallableMock, mock_open, patch
+try:
+    import httpx
+except ImportError:
+    import httpx2 as httpx
+from openai import AsyncOpenAI, RateLimitError
+from scripts.document_analyzer import DocumentAnalyzer, _chunk_text
 
+# Keep the whole module on one pytest-xdist worker (-n auto --dist=loadscope)
+# so the module-scoped analyzer and stub are built once per worker
+pytestmark = pytest.mark.xdist_group("doc_analyzer")
 
-@pytest.fixture
+# Compiled once; pytest.raises(match=...) accepts a pattern object directly
+_UNSUPPORTED_RE = re.compile("Unsupported file extension")
+
+
+def _rate_limit_error() -> RateLimitError:
+    """Build a RateLimitError the way the SDK raises one (HTTP 429)."""
+    response = httpx.Response(
+        429,
+        request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    )
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+@pytest.fixture(scope="module")
 def document_analyzer(mock_env_vars):
-    """Create a DocumentAnalyzer instance for testing."""
+    """Create a DocumentAnalyzer instance shared by the whole module.
+
+    The tests only patch chat.completions.create transiently, so reusing
+    one instance (and its underlying HTTP client) across tests is safe.
+    """
     return DocumentAnalyzer(api_key="test-api-key")
 
 
+@pytest.fixture(scope="module")
+def completions(document_analyzer):
+    """Resolve client.chat.completions once per module.
+
+    Both .chat and .completions are cached properties on the client, so
+    fire the descriptors a single time instead of on every patch target.
+    """
+    return document_analyzer.client.chat.completions
+
+
+@pytest.fixture(scope="module", autouse=True)
+def stub_completions(completions):
+    """Stub chat.completions.create once for the module.
+
+    Installing a single async stub avoids patch.object's per-test attribute
+    surgery. Tests control the response through the yielded state dict.
+    """
+    mp = pytest.MonkeyPatch()
+    state = {"content": "Test analysis result", "calls": 0}
+
+    # One reused SimpleNamespace tree: plain attribute access, none of
+    # Mock's construction or __getattr__ machinery
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=""))]
+    )
+
+    async def _create(**kwargs):
+        state["calls"] += 1
+        response.choices[0].message.content = state["content"]
+        return response
+
+    mp.setattr(completions, "create", _create)
+    yield state
+    mp.undo()
+
+
+@pytest.fixture(autouse=True)
+def _reset_stub(document_analyzer, stub_completions):
+    """Restore the stubbed response defaults between tests.
+
+    The analyzer is module-scoped, so its analysis cache must be cleared
+    too or one test's result gets served from another's cache entry.
+    """
+    stub_completions["content"] = "Test analysis result"
+    stub_completions["calls"] = 0
+    document_analyzer._analysis_cache.clear()
+
+
+@pytest.fixture(scope="class")
+def mock_pypdf():
+    """Patch pypdf once per class instead of resolving the target per test."""
+    with patch('scripts.document_analyzer.pypdf') as mock:
+        yield mock
+
+
 class TestDocumentAnalyzer:
     """Test class for DocumentAnalyzer."""
     
     def test_document_analyzer_initialization(self, document_analyzer):
         """Test DocumentAnalyzer initialization."""
         assert document_analyzer.client is not None
-        assert isinstance(document_analyzer.client, OpenAI)
-        assert document_analyzer.default_model in DocumentAnalyzer.AVAILABLE_MODELS
+        assert isinstance(document_analyzer.client, AsyncOpenAI)
+        assert document_analyzer.default_model in DocumentAnalyzer.AVAILABLE_MODELS_SET
     
-    @pytest.mark.asyncio
-    async def test_analyze_text(self, document_analyzer):
+    def test_analyze_text(self, document_analyzer):
         """Test text analysis functionality."""
         test_text = "This is a test document for analysis."
-        mock_response = Mock()
-        mock_response.choices = [Mock(message=Mock(content="Test analysis result"))]
-        
-        with patch.object(document_analyzer.client.chat.completions, 'create', return_value=mock_response):
-            result = await document_analyzer.analyze_text(test_text)
-            assert result == "Test analysis result"
-    
-    def test_load_text_txt_file(self, document_analyzer, test_data_dir):
-        """Test loading text from .txt file."""
-        # Create test data directory if it doesn't exist
-        test_data_dir.mkdir(exist_ok=True)
-        
-        # Create a test text file
-        test_txt_path = test_data_dir / "test.txt"
-        test_content = "This is test content"
-        test_txt_path.write_text(test_content)
-        
-        try:
-            result = document_analyzer.load_text(test_txt_path)
-            assert result == test_content
-        finally:
-            # Cleanup
-            if test_txt_path.exists():
-                test_txt_path.unlink()
-    
-    def test_load_text_file_not_found(self, document_analyzer):
-        """Test error handling for non-existent file."""
-        with pytest.raises(FileNotFoundError):
-            document_analyzer.load_text("nonexistent.txt")
-    
-    def test_load_text_unsupported_extension(self, document_analyzer, test_data_dir):
-        """Test error handling for unsupported file extension."""
-        test_data_dir.mkdir(exist_ok=True)
-        test_file = test_data_dir / "test.doc"
-        test_file.write_text("content")
-        
-        try:
-            with pytest.raises(ValueError, match="Unsupported file extension"):
-                document_analyzer.load_text(test_file)
-        finally:
-            if test_file.exists():
-                test_file.unlink()
+        result = asyncio.run(document_analyzer.analyze_text(test_text))
+        assert result == "Test analysis result"
+
+    def test_analyze_text_cache(self, document_analyzer, stub_completions):
+        """Test that identical analyze_text calls are served from cache."""
+        async def _run():
+            first = await document_analyzer.analyze_text("same text")
+            second = await document_analyzer.analyze_text("same text")
+            return first, second
+
+        first, second = asyncio.run(_run())
+
+        assert first == second == "Test analysis result"
+        assert stub_completions["calls"] == 1
+
+    def test_create_with_retry_transient_error(
+        self, document_analyzer, completions, monkeypatch
+    ):
+        """Test that rate-limited calls are retried until they succeed."""
+        monkeypatch.setattr(document_analyzer, "BACKOFF_BASE_SECONDS", 0.0)
+        state = {"calls": 0}
+        response = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Recovered"))]
+        )
+
+        async def _flaky(**kwargs):
+            state["calls"] += 1
+            if state["calls"] < 3:
+                raise _rate_limit_error()
+            return response
+
+        monkeypatch.setattr(completions, "create", _flaky)
+
+        result = asyncio.run(document_analyzer._create_with_retry(
+            model="gpt-3.5-turbo", messages=[]
+        ))
+        assert result.choices[0].message.content == "Recovered"
+        assert state["calls"] == 3
+
+    def test_create_with_retry_exhausts_retries(
+        self, document_analyzer, completions, monkeypatch
+    ):
+        """Test that the final attempt re-raises after MAX_RETRIES failures."""
+        monkeypatch.setattr(document_analyzer, "BACKOFF_BASE_SECONDS", 0.0)
+        state = {"calls": 0}
+
+        async def _always_limited(**kwargs):
+            state["calls"] += 1
+            raise _rate_limit_error()
+
+        monkeypatch.setattr(completions, "create", _always_limited)
+
+        with pytest.raises(RateLimitError):
+            asyncio.run(document_analyzer._create_with_retry(
+                model="gpt-3.5-turbo", messages=[]
+            ))
+        assert state["calls"] == DocumentAnalyzer.MAX_RETRIES
+
+    def test_batch_analyze(self, document_analyzer):
+        """Test bounded-concurrency batch analysis."""
+        results = asyncio.run(document_analyzer.batch_analyze(["one", "two", "three"]))
+        assert results == ["Test analysis result"] * 3
+
+    def test_load_text_txt_file(self, document_analyzer):
+        """Test loading .txt content without touching the filesystem."""
+        with patch("scripts.document_analyzer.os.path.isfile", return_value=True), \
+             patch("builtins.open", mock_open(read_data="This is test content")):
+            result = document_analyzer.load_text("anything.txt")
+        assert result == "This is test content"
+
+    @pytest.mark.parametrize("fixture,expected", [
+        (None, FileNotFoundError),
+        ("sample_doc", ValueError),
+    ], ids=["missing", "unsupported"])
+    def test_load_text_errors(self, request, document_analyzer, fixture, expected):
+        """Test load_text error handling for missing and unsupported inputs."""
+        path = "nonexistent.txt" if fixture is None else request.getfixturevalue(fixture)
+        match = _UNSUPPORTED_RE if expected is ValueError else None
+        with pytest.raises(expected, match=match):
+            document_analyzer.load_text(path)
     
-    @patch('scripts.document_analyzer.pypdf')
-    def test_extract_text_from_pdf(self, mock_pypdf, document_analyzer, test_data_dir):
+    def test_extract_text_from_pdf(self, mock_pypdf, document_analyzer, sample_pdf):
         """Test PDF text extraction."""
-        # Create test data directory if it doesn't exist
-        test_data_dir.mkdir(exist_ok=True)
-        
-        # Create a mock PDF file
-        test_pdf_path = test_data_dir / "test.pdf"
-        test_pdf_path.write_bytes(b"fake pdf content")
-        
-        # Mock pypdf
+        # The reader is only attribute-accessed, so skip Mock's callable setup;
+        # the page stays a Mock because extract_text is actually called
         mock_page = Mock()
         mock_page.extract_text.return_value = "Extracted PDF text"
-        mock_reader = Mock()
+        mock_reader = NonCallableMock()
         mock_reader.pages = [mock_page]
         mock_pypdf.PdfReader.return_value = mock_reader
-        
-        try:
-            result = document_analyzer.extract_text_from_pdf(test_pdf_path)
-            assert result == "Extracted PDF text"
-        finally:
-            # Cleanup
-            if test_pdf_path.exists():
-                test_pdf_path.unlink()
+
+        result = document_analyzer.extract_text_from_pdf(sample_pdf)
+        assert result == "Extracted PDF text"
     
-    @pytest.mark.asyncio
-    async def test_analyze_document(self, document_analyzer, test_data_dir):
+    def test_analyze_document(self, document_analyzer, sample_txt):
         """Test complete document analysis workflow."""
-        # Create test data directory if it doesn't exist
-        test_data_dir.mkdir(exist_ok=True)
-        
-        # Create a test text file
-        test_txt_path = test_data_dir / "test.txt"
-        test_content = "This is test document content"
-        test_txt_path.write_text(test_content)
-        
-        mock_response = Mock()
-        mock_response.choices = [Mock(message=Mock(content="Test analysis result"))]
-        
-        try:
-            with patch.object(document_analyzer.client.chat.completions, 'create', return_value=mock_response):
-                result = await document_analyzer.analyze_document(test_txt_path)
-                assert result == "Test analysis result"
-        finally:
-            # Cleanup
-            if test_txt_path.exists():
-                test_txt_path.unlink()
-    
-    def test_ask_questions(self, document_analyzer):
+        path, _ = sample_txt
+        result = asyncio.run(document_analyzer.analyze_document(path))
+        assert result == "Test analysis result"
+
+    def test_analyze_document_long_text(
+        self, document_analyzer, stub_completions, tmp_path
+    ):
+        """Test that long documents take the chunked map-reduce path."""
+        # Distinct paragraphs so no two chunks are identical and every
+        # chunk analysis misses the cache
+        text = "\n\n".join(f"Paragraph {i} " + "x" * 120 for i in range(120))
+        assert len(text) > DocumentAnalyzer.CHUNK_SIZE_CHARS
+        path = tmp_path / "long.txt"
+        path.write_text(text, encoding="utf-8")
+
+        result = asyncio.run(document_analyzer.analyze_document(path))
+
+        assert result == "Test analysis result"
+        chunks = _chunk_text(
+            text,
+            DocumentAnalyzer.CHUNK_SIZE_CHARS,
+            DocumentAnalyzer.CHUNK_OVERLAP_CHARS,
+        )
+        assert len(chunks) > 1
+        # One call per chunk plus the combining call
+        assert stub_completions["calls"] == len(chunks) + 1
+
+    def test_run_pipeline(self, document_analyzer, sample_txt):
+        """Test the extract-analyze pipeline on a mix of good and bad paths."""
+        path, _ = sample_txt
+        results = asyncio.run(document_analyzer.run_pipeline(
+            [path, "missing.txt"]
+        ))
+        assert results[0] == "Test analysis result"
+        assert isinstance(results[1], FileNotFoundError)
+
+    def test_ask_questions(self, document_analyzer, stub_completions):
         """Test the ask_questions method."""
-        mock_response = Mock()
-        mock_response.choices = [Mock(message=Mock(content="Test question response"))]
-        
-        with patch.object(document_analyzer.client.chat.completions, 'create', return_value=mock_response):
-            result = document_analyzer.ask_questions(
-                prompt="What is the main theme?",
-                example_prompt="Example question",
-                example_response="Example answer",
-                text_to_analyze="Test text to analyze"
-            )
-            assert result == "Test question response" 
+        stub_completions["content"] = "Test question response"
+
+        result = asyncio.run(document_analyzer.ask_questions(
+            prompt="What is the main theme?",
+            example_prompt="Example question",
+            example_response="Example answer",
+            text_to_analyze="Test text to analyze"
+        ))
+        assert result == "Test question response"